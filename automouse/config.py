@@ -4,6 +4,7 @@ Configuration loading and management.
 
 import os
 import yaml
+from functools import lru_cache
 from pathlib import Path
 from dataclasses import dataclass, field
 from typing import Dict, List, Optional
@@ -37,8 +38,9 @@ class Config:
     any_keyboard: bool = True  # Use any keyboard as target
 
 
+@lru_cache(maxsize=1)
 def get_config_path() -> Path:
-    """Get the configuration file path."""
+    """Get the configuration file path (resolved once per process)."""
     if os.name == 'nt':  # Windows
         base = Path(os.environ.get('APPDATA', '~'))
     elif os.name == 'posix':
@@ -164,6 +166,16 @@ def save_config(config: Config, path: Optional[Path] = None):
             'exit_on_other_key': layer.exit_on_other_key
         }
 
+    text = yaml.dump(data, default_flow_style=False)
+
+    # Skip the write when the file already holds exactly this content
+    try:
+        with open(path, 'r') as f:
+            if f.read() == text:
+                return
+    except (OSError, UnicodeDecodeError):
+        pass  # Missing, unreadable or not in the locale encoding: overwrite it
+
     path.parent.mkdir(parents=True, exist_ok=True)
     with open(path, 'w') as f:
-        yaml.dump(data, f, default_flow_style=False)
+        f.write(text)
@@ -7,7 +7,6 @@ without interfering with normal operation.
 
 import logging
 import threading
-import time
 from typing import Callable, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
@@ -19,7 +18,7 @@ try:
     log.debug("hidapi imported successfully")
 except ImportError as e:
     HID_AVAILABLE = False
-    log.warning(f"hidapi not available: {e}")
+    log.warning("hidapi not available: %s", e)
 
 
 # Standard HID usage pages and usages for pointing devices
@@ -57,6 +56,20 @@ class HIDDevice:
         return self.path == other.path
 
 
+def _device_from_info(dev_info: dict) -> HIDDevice:
+    """Build a HIDDevice from a hid.enumerate() entry."""
+    return HIDDevice(
+        path=dev_info.get('path', b''),
+        vid=dev_info.get('vendor_id', 0),
+        pid=dev_info.get('product_id', 0),
+        product=dev_info.get('product_string', '') or '',
+        manufacturer=dev_info.get('manufacturer_string', '') or '',
+        serial=dev_info.get('serial_number', '') or '',
+        usage_page=dev_info.get('usage_page', 0),
+        usage=dev_info.get('usage', 0)
+    )
+
+
 def enumerate_pointing_devices() -> List[HIDDevice]:
     """
     Enumerate all connected pointing devices.
@@ -68,16 +81,7 @@ def enumerate_pointing_devices() -> List[HIDDevice]:
     devices = []
     try:
         for dev_info in hid.enumerate():
-            device = HIDDevice(
-                path=dev_info.get('path', b''),
-                vid=dev_info.get('vendor_id', 0),
-                pid=dev_info.get('product_id', 0),
-                product=dev_info.get('product_string', '') or '',
-                manufacturer=dev_info.get('manufacturer_string', '') or '',
-                serial=dev_info.get('serial_number', '') or '',
-                usage_page=dev_info.get('usage_page', 0),
-                usage=dev_info.get('usage', 0)
-            )
+            device = _device_from_info(dev_info)
             if device.is_pointing_device:
                 devices.append(device)
     except Exception:
@@ -96,21 +100,12 @@ def enumerate_all_devices() -> List[HIDDevice]:
     try:
         log.debug("Calling hid.enumerate()...")
         raw_devices = hid.enumerate()
-        log.debug(f"Found {len(raw_devices)} raw HID devices")
+        log.debug("Found %d raw HID devices", len(raw_devices))
 
         for dev_info in raw_devices:
-            devices.append(HIDDevice(
-                path=dev_info.get('path', b''),
-                vid=dev_info.get('vendor_id', 0),
-                pid=dev_info.get('product_id', 0),
-                product=dev_info.get('product_string', '') or '',
-                manufacturer=dev_info.get('manufacturer_string', '') or '',
-                serial=dev_info.get('serial_number', '') or '',
-                usage_page=dev_info.get('usage_page', 0),
-                usage=dev_info.get('usage', 0)
-            ))
+            devices.append(_device_from_info(dev_info))
     except Exception as e:
-        log.error(f"Error enumerating HID devices: {e}")
+        log.error("Error enumerating HID devices: %s", e)
 
     return devices
 
@@ -131,6 +126,7 @@ class HIDMonitor:
         self._on_activity = on_activity
         self._running = False
         self._thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
         self._devices: Set[bytes] = set()
         self._target_vids_pids: Optional[Set[Tuple[int, int]]] = None
 
@@ -152,12 +148,14 @@ class HIDMonitor:
             return
 
         self._running = True
+        self._stop_event.clear()
         self._thread = threading.Thread(target=self._monitor_loop, daemon=True)
         self._thread.start()
 
     def stop(self):
         """Stop monitoring."""
         self._running = False
+        self._stop_event.set()
         if self._thread:
             self._thread.join(timeout=1.0)
             self._thread = None
@@ -169,7 +167,8 @@ class HIDMonitor:
                 self._update_devices()
             except Exception:
                 pass
-            time.sleep(1.0)  # Check for new devices every second
+            # Check for new devices every second; stop() wakes us immediately
+            self._stop_event.wait(1.0)
 
     def _update_devices(self):
         """Update the list of monitored devices."""
@@ -8,7 +8,8 @@ and pynput for mouse control/monitoring.
 import logging
 import queue
 import threading
-from typing import Callable, Dict, Optional, Set
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
 from enum import Enum, auto
 
 import keyboard as kb
@@ -40,6 +41,10 @@ ACTION_MAP = {
     'mouse_scroll_right': MouseAction.SCROLL_RIGHT,
 }
 
+# Default minimum spacing between forwarded move/scroll activity signals (seconds).
+# The layer timeout is hundreds of ms, so a 1000 Hz mouse needs no more than this.
+MOUSE_MOVE_INTERVAL = 0.005
+
 # Mapping MouseAction to pynput mouse buttons
 BUTTON_MAP = {
     MouseAction.LEFT_CLICK: Button.left,
@@ -47,13 +52,35 @@ BUTTON_MAP = {
     MouseAction.MIDDLE_CLICK: Button.middle,
 }
 
+# Mapping MouseAction to pynput scroll deltas (dx, dy)
+SCROLL_MAP = {
+    MouseAction.SCROLL_UP: (0, 3),
+    MouseAction.SCROLL_DOWN: (0, -3),
+    MouseAction.SCROLL_LEFT: (-3, 0),
+    MouseAction.SCROLL_RIGHT: (3, 0),
+}
+
 
 class KeyboardController:
     """
     Handles keyboard interception and mouse action injection.
     """
 
-    def __init__(self):
+    __slots__ = (
+        '_mappings', '_mouse_listener', '_mouse_controller',
+        '_layer_active', '_exit_on_unmapped', '_held_keys',
+        '_move_interval', '_last_move_signal', '_mouse_activity_pending',
+        '_registered_hotkeys', '_hotkey_handlers',
+        '_on_mouse_activity', '_on_mapped_key', '_on_unmapped_key',
+        '_action_queue', '_worker_thread', '_running',
+    )
+
+    def __init__(self, move_interval: float = MOUSE_MOVE_INTERVAL):
+        """
+        Args:
+            move_interval: Minimum spacing in seconds between forwarded
+                move/scroll activity signals. 0 forwards every event.
+        """
         self._mappings: Dict[str, MouseAction] = {}
         self._mouse_listener = None
         self._mouse_controller = mouse.Controller()
@@ -61,15 +88,21 @@ class KeyboardController:
         self._layer_active = False
         self._exit_on_unmapped = True
         self._held_keys: Set[str] = set()
+        self._move_interval = move_interval
+        self._last_move_signal = 0.0
+        self._mouse_activity_pending = False
         self._registered_hotkeys: list = []
+        # (key, press handler, release handler), built once per set_mappings
+        self._hotkey_handlers: List[Tuple[str, Callable, Callable]] = []
 
         # Callbacks
         self._on_mouse_activity: Optional[Callable[[], None]] = None
         self._on_mapped_key: Optional[Callable[[], None]] = None
         self._on_unmapped_key: Optional[Callable[[], None]] = None
 
-        # Worker thread for slow operations
-        self._action_queue: queue.Queue = queue.Queue()
+        # Worker thread for slow operations, fed by hook and listener threads.
+        # SimpleQueue is implemented in C and skips Queue's task tracking.
+        self._action_queue: queue.SimpleQueue = queue.SimpleQueue()
         self._worker_thread: Optional[threading.Thread] = None
         self._running = False
 
@@ -79,7 +112,17 @@ class KeyboardController:
             action = ACTION_MAP.get(action_str.lower())
             if action:
                 self._mappings[key_str.lower()] = action
-        log.info(f"Loaded {len(self._mappings)} key mappings: {list(self._mappings.keys())}")
+
+        # Build the hook callbacks here rather than on every layer activation
+        self._hotkey_handlers = [
+            (
+                key_name,
+                lambda e, k=key_name, a=action: self._on_mapped_press(k, a),
+                lambda e, k=key_name, a=action: self._on_mapped_release(k, a),
+            )
+            for key_name, action in self._mappings.items()
+        ]
+        log.info("Loaded %d key mappings: %s", len(self._mappings), list(self._mappings))
 
     def set_callbacks(
         self,
@@ -94,7 +137,7 @@ class KeyboardController:
     def set_layer_active(self, active: bool):
         if self._layer_active != active:
             self._layer_active = active
-            log.info(f"Layer active: {active}")
+            log.debug("Layer active: %s", active)
 
             if active:
                 self._register_hotkeys()
@@ -109,27 +152,19 @@ class KeyboardController:
         """Register hotkeys for mapped keys when layer is active."""
         self._unregister_hotkeys()  # Clear any existing
 
-        for key_name, action in self._mappings.items():
+        for key_name, on_press, on_release in self._hotkey_handlers:
             try:
                 # Register press handler (suppress=True blocks the key)
-                hook_id = kb.on_press_key(
-                    key_name,
-                    lambda e, k=key_name, a=action: self._on_mapped_press(k, a),
-                    suppress=True
-                )
+                hook_id = kb.on_press_key(key_name, on_press, suppress=True)
                 self._registered_hotkeys.append(hook_id)
 
                 # Register release handler
-                hook_id = kb.on_release_key(
-                    key_name,
-                    lambda e, k=key_name, a=action: self._on_mapped_release(k, a),
-                    suppress=True
-                )
+                hook_id = kb.on_release_key(key_name, on_release, suppress=True)
                 self._registered_hotkeys.append(hook_id)
 
-                log.debug(f"Registered hotkey: {key_name}")
+                log.debug("Registered hotkey: %s", key_name)
             except Exception as e:
-                log.error(f"Failed to register hotkey {key_name}: {e}")
+                log.error("Failed to register hotkey %s: %s", key_name, e)
 
     def _unregister_hotkeys(self):
         """Unregister all hotkeys."""
@@ -166,75 +201,86 @@ class KeyboardController:
         log.info("Worker thread started")
 
         while self._running:
-            try:
-                item = self._action_queue.get(timeout=0.1)
-            except queue.Empty:
-                continue
+            # Block until there is work; stop() posts a 'stop' item to wake us
+            item = self._action_queue.get()
 
             try:
                 cmd = item[0]
 
-                if cmd == 'press':
+                if cmd == 'stop':
+                    break
+
+                elif cmd == 'press':
                     key_str, action = item[1], item[2]
-                    log.info(f"Key '{key_str}' -> {action.name}")
+                    log.debug("Key '%s' -> %s", key_str, action.name)
                     self._do_mouse_action(action, pressed=True)
                     if self._on_mapped_key:
                         self._on_mapped_key()
 
                 elif cmd == 'release':
                     key_str, action = item[1], item[2]
-                    log.debug(f"Key '{key_str}' released")
+                    log.debug("Key '%s' released", key_str)
                     self._do_mouse_action(action, pressed=False)
 
                 elif cmd == 'mouse_activity':
+                    # Clear before the callback so new activity is not lost
+                    self._mouse_activity_pending = False
                     if self._on_mouse_activity:
                         self._on_mouse_activity()
 
             except Exception as e:
-                log.error(f"Worker error: {e}")
+                log.error("Worker error: %s", e)
 
         log.info("Worker thread stopped")
 
     def _do_mouse_action(self, action: MouseAction, pressed: bool):
         """Perform mouse action."""
         try:
-            if action in BUTTON_MAP:
-                button = BUTTON_MAP[action]
+            button = BUTTON_MAP.get(action)
+            if button is not None:
                 if pressed:
-                    log.info(f"Mouse {button} press")
+                    log.debug("Mouse %s press", button)
                     self._mouse_controller.press(button)
                 else:
-                    log.debug(f"Mouse {button} release")
+                    log.debug("Mouse %s release", button)
                     self._mouse_controller.release(button)
             elif pressed:
-                if action == MouseAction.SCROLL_UP:
-                    self._mouse_controller.scroll(0, 3)
-                elif action == MouseAction.SCROLL_DOWN:
-                    self._mouse_controller.scroll(0, -3)
-                elif action == MouseAction.SCROLL_LEFT:
-                    self._mouse_controller.scroll(-3, 0)
-                elif action == MouseAction.SCROLL_RIGHT:
-                    self._mouse_controller.scroll(3, 0)
+                delta = SCROLL_MAP.get(action)
+                if delta is not None:
+                    self._mouse_controller.scroll(*delta)
         except Exception as e:
-            log.error(f"Mouse action error: {e}")
-
-    def _on_mouse_move(self, x, y):
+            log.error("Mouse action error: %s", e)
+
+    def _queue_mouse_activity(self):
+        """Queue a mouse-activity item unless one is already waiting."""
+        # The worker only needs to know that activity happened, so one
+        # pending item covers any number of events that arrive before it runs.
+        if self._mouse_activity_pending:
+            return
+        self._mouse_activity_pending = True
         try:
             self._action_queue.put_nowait(('mouse_activity',))
         except:
-            pass
+            self._mouse_activity_pending = False
+
+    def _queue_motion_activity(self):
+        """Forward high-rate move/scroll events at most once per move_interval."""
+        # Coarse-grained activity signal: the layer only needs to know the
+        # pointer is in use, not about every packet.
+        now = time.monotonic()
+        if now - self._last_move_signal < self._move_interval:
+            return
+        self._last_move_signal = now
+        self._queue_mouse_activity()
+
+    def _on_mouse_move(self, x, y):
+        self._queue_motion_activity()
 
     def _on_mouse_click(self, x, y, button, pressed):
-        try:
-            self._action_queue.put_nowait(('mouse_activity',))
-        except:
-            pass
+        self._queue_mouse_activity()
 
     def _on_mouse_scroll(self, x, y, dx, dy):
-        try:
-            self._action_queue.put_nowait(('mouse_activity',))
-        except:
-            pass
+        self._queue_motion_activity()
 
     def start(self):
         """Start listeners."""
@@ -261,6 +307,7 @@ class KeyboardController:
         """Stop listeners."""
         log.info("Stopping...")
         self._running = False
+        self._action_queue.put_nowait(('stop',))
 
         self._unregister_hotkeys()
 
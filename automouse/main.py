@@ -5,11 +5,15 @@ AutoMouse - Main entry point and system tray daemon.
 import sys
 import os
 import logging
+import queue
+import subprocess
 import threading
+import time
 import tkinter as tk
 from tkinter import ttk
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional, Tuple
 
 # Handle imports for when pystray/PIL aren't available
 try:
@@ -22,15 +26,94 @@ except ImportError:
 from .config import load_config, get_config_path, Config
 from .state import LayerStateMachine, LayerState, StateChange
 from .keyboard import KeyboardController
-from .hid_monitor import enumerate_pointing_devices, enumerate_all_devices, HID_AVAILABLE
+from .hid_monitor import HIDDevice, enumerate_pointing_devices, enumerate_all_devices, HID_AVAILABLE
 
-# Configure logging
+
+class _LogFormatter(logging.Formatter):
+    """
+    Formats records as 'HH:MM:SS.mmm [LEVEL] name: message'.
+
+    The strftime result is reused for every record within the same second,
+    which matters when DEBUG logging is enabled on the input paths.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._last_sec = -1
+        self._last_str = ''
+
+    def format(self, record: logging.LogRecord) -> str:
+        sec = int(record.created)
+        if sec != self._last_sec:
+            self._last_str = time.strftime('%H:%M:%S', time.localtime(sec))
+            self._last_sec = sec
+
+        s = f"{self._last_str}.{int(record.msecs):03d} [{record.levelname}] {record.name}: {record.getMessage()}"
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            s = f"{s}\n{record.exc_text}"
+        if record.stack_info:
+            s = f"{s}\n{self.formatStack(record.stack_info)}"
+        return s
+
+
+# Configure logging (set AUTOMOUSE_LOGLEVEL=DEBUG for verbose output)
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(_LogFormatter())
+_log_level_name = os.environ.get('AUTOMOUSE_LOGLEVEL', 'INFO').upper()
+# getLevelName returns the int level for known names, a string otherwise
+_log_level = logging.getLevelName(_log_level_name)
+_log_level_valid = isinstance(_log_level, int)
+if not _log_level_valid:
+    _log_level = logging.INFO
 logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s.%(msecs)03d [%(levelname)s] %(name)s: %(message)s',
-    datefmt='%H:%M:%S'
+    level=_log_level,
+    handlers=[_log_handler]
 )
 log = logging.getLogger(__name__)
+if not _log_level_valid:
+    log.warning("Unknown AUTOMOUSE_LOGLEVEL %r, using INFO", _log_level_name)
+
+# States in which the mouse layer is engaged
+_ACTIVE_STATES = frozenset({LayerState.MOUSE_LAYER_ACTIVE, LayerState.LATCHED})
+
+
+# Devices dialog enumeration cache: (time.monotonic() of the scan, devices)
+DEVICE_CACHE_MAX_AGE = 2.0  # seconds
+_device_cache: Optional[Tuple[float, List[HIDDevice]]] = None
+
+
+def _cached_devices(max_age: float = DEVICE_CACHE_MAX_AGE) -> Optional[List[HIDDevice]]:
+    """Return the cached scan if it is younger than max_age seconds, else None."""
+    cached = _device_cache
+    if cached is not None and time.monotonic() - cached[0] < max_age:
+        return cached[1]
+    return None
+
+
+def _enumerate_devices_cached(max_age: float = DEVICE_CACHE_MAX_AGE) -> List[HIDDevice]:
+    """Enumerate all HID devices, reusing a scan younger than max_age seconds."""
+    global _device_cache
+    devices = _cached_devices(max_age)
+    if devices is not None:
+        return devices
+
+    devices = enumerate_all_devices()
+    _device_cache = (time.monotonic(), devices)
+    return devices
+
+
+def _scan_devices(max_age: float, results: queue.SimpleQueue, scan_id: int):
+    """
+    Devices dialog worker: enumerate and put (scan_id, devices) on results.
+
+    Must not touch any Tk object. If the dialog is closed mid-scan, a Tk
+    reference held here would be the last one, and releasing the Tcl
+    interpreter off its own thread aborts the whole process.
+    """
+    results.put((scan_id, _enumerate_devices_cached(max_age) if HID_AVAILABLE else []))
 
 
 def show_devices_dialog():
@@ -71,17 +154,24 @@ def show_devices_dialog():
     tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-    # Populate device list
-    if not HID_AVAILABLE:
-        tree.insert('', tk.END, values=(
-            'hidapi not available',
-            'Install with: pip install hidapi',
-            '',
-            ''
-        ))
-    else:
-        devices = enumerate_all_devices()
-        if devices:
+    # Populate device list. A fresh cached scan is shown directly; otherwise
+    # enumeration runs on a worker thread and the Tk thread polls for its
+    # result and fills in the rows.
+    scan_results: queue.SimpleQueue = queue.SimpleQueue()
+    latest_scan = 0  # Only the newest scan's result is shown
+    shown_scan = 0
+    polling = False
+
+    def populate(devices):
+        tree.delete(*tree.get_children())
+        if not HID_AVAILABLE:
+            tree.insert('', tk.END, values=(
+                'hidapi not available',
+                'Install with: pip install hidapi',
+                '',
+                ''
+            ))
+        elif devices:
             for d in devices:
                 device_type = "POINTING" if d.is_pointing_device else "Other"
                 name = d.product or d.manufacturer or "Unknown Device"
@@ -96,11 +186,49 @@ def show_devices_dialog():
                 ''
             ))
 
+    def check_results():
+        nonlocal polling, shown_scan
+        while True:
+            try:
+                scan_id, devices = scan_results.get_nowait()
+            except queue.Empty:
+                break
+            if scan_id == latest_scan:
+                shown_scan = scan_id
+                populate(devices)
+            # Otherwise a stale result from a scan superseded by Refresh
+        if shown_scan == latest_scan:
+            polling = False
+        else:
+            root.after(50, check_results)
+
+    def start_scan(max_age=DEVICE_CACHE_MAX_AGE):
+        nonlocal latest_scan, shown_scan, polling
+        latest_scan += 1
+        devices = _cached_devices(max_age) if HID_AVAILABLE else []
+        if devices is not None:
+            shown_scan = latest_scan
+            populate(devices)
+            return
+
+        tree.delete(*tree.get_children())
+        tree.insert('', tk.END, values=('Scanning...', '', '', ''))
+        threading.Thread(
+            target=_scan_devices, args=(max_age, scan_results, latest_scan), daemon=True
+        ).start()
+        if not polling:
+            polling = True
+            root.after(50, check_results)
+
     # Info label
     info_text = "Note: AutoMouse uses pynput for mouse detection, which works with any mouse."
     info_label = ttk.Label(main_frame, text=info_text, font=('Segoe UI', 9), foreground='gray')
     info_label.pack(pady=(10, 0))
 
+    # Refresh button (re-enumerates in the background)
+    refresh_btn = ttk.Button(main_frame, text="Refresh", command=lambda: start_scan(0))
+    refresh_btn.pack(pady=(10, 0))
+
     # Close button
     close_btn = ttk.Button(main_frame, text="Close", command=root.destroy)
     close_btn.pack(pady=(10, 0))
@@ -114,26 +242,72 @@ def show_devices_dialog():
     root.geometry(f'{width}x{height}+{x}+{y}')
 
     # Run dialog
+    start_scan()
     root.mainloop()
 
 
+@lru_cache(maxsize=1)
+def _mouse_overlay() -> 'Image.Image':
+    """Draw the state-independent mouse sprite for the tray icon."""
+    overlay = Image.new('RGBA', (64, 64), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+
+    # Mouse icon (simplified)
+    mouse_color = (255, 255, 255, 255)
+    # Body
+    draw.ellipse([18, 20, 46, 52], fill=mouse_color)
+    # Ears
+    draw.ellipse([14, 16, 26, 28], fill=mouse_color)
+    draw.ellipse([38, 16, 50, 28], fill=mouse_color)
+    # Button line, left transparent so the background shows through
+    draw.line([32, 24, 32, 38], fill=(0, 0, 0, 0), width=2)
+
+    return overlay
+
+
+@lru_cache(maxsize=2)
+def _make_icon(active: bool) -> 'Image.Image':
+    """Draw the tray icon for the given layer state (cached per state)."""
+    size = 64
+    img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+
+    # Background circle
+    bg_color = (76, 175, 80, 255) if active else (158, 158, 158, 255)
+    draw.ellipse([4, 4, size-4, size-4], fill=bg_color)
+
+    overlay = _mouse_overlay()
+    img.paste(overlay, (0, 0), overlay)
+
+    return img
+
+
 class AutoMouse:
     """Main application controller."""
 
+    __slots__ = (
+        'config', 'state_machine', 'keyboard', 'tray',
+        '_menu', '_config_path', '_tray_active', '_running', '_stop_event',
+    )
+
     def __init__(self):
         self.config: Optional[Config] = None
         self.state_machine: Optional[LayerStateMachine] = None
         self.keyboard: Optional[KeyboardController] = None
         self.tray: Optional['pystray.Icon'] = None
+        self._menu: Optional['pystray.Menu'] = None
+        self._config_path: Path = get_config_path()
+        self._tray_active: Optional[bool] = None  # State the tray icon shows
         self._running = False
+        self._stop_event = threading.Event()
 
     def load_config(self):
         """Load or create configuration."""
         log.info("Loading configuration...")
-        self.config = load_config()
+        self.config = load_config(self._config_path)
 
         # Get layer config (use first layer or default)
-        layer_name = list(self.config.layers.keys())[0] if self.config.layers else 'mouse_layer'
+        layer_name = next(iter(self.config.layers), 'mouse_layer')
         layer_config = self.config.layers.get(layer_name)
 
         if layer_config:
@@ -150,11 +324,14 @@ class AutoMouse:
             }
             exit_on_unmapped = True
 
-        log.info(f"Layer config: timeout={timeout}ms, exit_on_unmapped={exit_on_unmapped}")
-        log.info(f"Key mappings: {mappings}")
+        log.info("Layer config: timeout=%sms, exit_on_unmapped=%s", timeout, exit_on_unmapped)
+        log.info("Key mappings: %s", mappings)
 
-        # Initialize state machine
+        # Initialize state machine (replacing any previous one on reload)
+        if self.state_machine:
+            self.state_machine.close()
         self.state_machine = LayerStateMachine(timeout_ms=timeout)
+        self.state_machine.add_listener(self._on_layer_change, fast=True)
         self.state_machine.add_listener(self._on_state_change)
 
         # Initialize keyboard controller
@@ -182,102 +359,96 @@ class AutoMouse:
         if self.state_machine:
             self.state_machine.on_unmapped_key()
 
+    def _on_layer_change(self, change: StateChange):
+        """
+        Fast state listener: runs on the transitioning thread so key remapping
+        switches on/off without waiting for the notification thread.
+        """
+        if self.keyboard:
+            self.keyboard.set_layer_active(change.new_state in _ACTIVE_STATES)
+
     def _on_state_change(self, change: StateChange):
         """Called when layer state changes."""
-        log.info(f"State change: {change.old_state.name} -> {change.new_state.name} (reason: {change.reason})")
-
-        if self.keyboard:
-            is_active = change.new_state in (
-                LayerState.MOUSE_LAYER_ACTIVE,
-                LayerState.LATCHED
-            )
-            self.keyboard.set_layer_active(is_active)
+        log.info("State change: %s -> %s (reason: %s)",
+                 change.old_state.name, change.new_state.name, change.reason)
 
         # Update tray icon if available
-        self._update_tray_icon()
+        self._update_tray_icon(is_active=change.new_state in _ACTIVE_STATES)
 
     def _create_icon(self, active: bool = False) -> 'Image.Image':
         """Create tray icon image."""
-        size = 64
-        img = Image.new('RGBA', (size, size), (0, 0, 0, 0))
-        draw = ImageDraw.Draw(img)
-
-        # Background circle
-        bg_color = (76, 175, 80, 255) if active else (158, 158, 158, 255)
-        draw.ellipse([4, 4, size-4, size-4], fill=bg_color)
-
-        # Mouse icon (simplified)
-        mouse_color = (255, 255, 255, 255)
-        # Body
-        draw.ellipse([18, 20, 46, 52], fill=mouse_color)
-        # Ears
-        draw.ellipse([14, 16, 26, 28], fill=mouse_color)
-        draw.ellipse([38, 16, 50, 28], fill=mouse_color)
-        # Button line
-        draw.line([32, 24, 32, 38], fill=bg_color, width=2)
-
-        return img
-
-    def _update_tray_icon(self):
-        """Update the tray icon based on current state."""
+        return _make_icon(bool(active))
+
+    def _update_tray_icon(self, is_active: Optional[bool] = None):
+        """
+        Update the tray icon based on current state.
+
+        Callers that already know the new state pass is_active; otherwise
+        it is read from the state machine. Both images are drawn in start(),
+        so this is just a lookup and, if the state changed, one assignment.
+        Errors propagate to the state machine, which logs listener failures.
+        """
         if not TRAY_AVAILABLE or not self.tray:
             return
 
-        try:
+        if is_active is None:
             is_active = (
-                self.state_machine and
+                self.state_machine is not None and
                 self.state_machine.state != LayerState.NORMAL
             )
-            self.tray.icon = self._create_icon(active=is_active)
-        except Exception as e:
-            log.error(f"Error updating tray icon: {e}")
+        if is_active == self._tray_active:
+            return  # Icon already shows this state
+        self.tray.icon = self._create_icon(active=is_active)
+        self._tray_active = is_active
+
+    def _menu_status(self, item) -> str:
+        """Tray menu status text (pystray re-evaluates it when the menu opens)."""
+        if self.state_machine:
+            return f"Status: {self.state_machine.state.name}"
+        return "Status: Unknown"
+
+    def _menu_open_config(self, icon, item):
+        config_path = self._config_path
+        log.info("Opening config: %s", config_path)
+        if sys.platform == 'win32':
+            os.startfile(config_path)
+        elif sys.platform == 'darwin':
+            subprocess.Popen(['open', str(config_path)])
+        else:
+            subprocess.Popen(['xdg-open', str(config_path)])
+
+    def _menu_reload_config(self, icon, item):
+        log.info("Reloading configuration...")
+        self.load_config()
+        log.info("Configuration reloaded")
+
+    def _menu_show_devices(self, icon, item):
+        # Run dialog in a separate thread to not block the tray
+        threading.Thread(target=show_devices_dialog, daemon=True).start()
+
+    def _menu_quit(self, icon, item):
+        log.info("Quit requested from tray menu")
+        self.stop()
 
     def _create_menu(self):
         """Create the system tray menu."""
         if not TRAY_AVAILABLE:
             return None
 
-        def get_status(item):
-            if self.state_machine:
-                return f"Status: {self.state_machine.state.name}"
-            return "Status: Unknown"
-
-        def open_config(icon, item):
-            config_path = get_config_path()
-            log.info(f"Opening config: {config_path}")
-            if sys.platform == 'win32':
-                os.startfile(config_path)
-            elif sys.platform == 'darwin':
-                os.system(f'open "{config_path}"')
-            else:
-                os.system(f'xdg-open "{config_path}"')
-
-        def reload_config(icon, item):
-            log.info("Reloading configuration...")
-            self.load_config()
-            log.info("Configuration reloaded")
-
-        def show_devices(icon, item):
-            # Run dialog in a separate thread to not block the tray
-            threading.Thread(target=show_devices_dialog, daemon=True).start()
-
-        def quit_app(icon, item):
-            log.info("Quit requested from tray menu")
-            self.stop()
-
         return pystray.Menu(
-            pystray.MenuItem(get_status, None, enabled=False),
+            pystray.MenuItem(self._menu_status, None, enabled=False),
             pystray.Menu.SEPARATOR,
-            pystray.MenuItem("Show Devices", show_devices),
-            pystray.MenuItem("Open Config", open_config),
-            pystray.MenuItem("Reload Config", reload_config),
+            pystray.MenuItem("Show Devices", self._menu_show_devices),
+            pystray.MenuItem("Open Config", self._menu_open_config),
+            pystray.MenuItem("Reload Config", self._menu_reload_config),
             pystray.Menu.SEPARATOR,
-            pystray.MenuItem("Quit", quit_app)
+            pystray.MenuItem("Quit", self._menu_quit)
         )
 
     def start(self):
         """Start the daemon."""
         self._running = True
+        self._stop_event.clear()
 
         log.info("="*60)
         log.info("AutoMouse starting...")
@@ -290,12 +461,12 @@ class AutoMouse:
         if self.keyboard:
             self.keyboard.start()
 
-        config_path = get_config_path()
-        log.info(f"Config file: {config_path}")
+        config_path = self._config_path
+        log.info("Config file: %s", config_path)
         print(f"\nAutoMouse started!")
         print(f"Config: {config_path}")
         if self.config and self.config.layers:
-            layer = list(self.config.layers.values())[0]
+            layer = next(iter(self.config.layers.values()))
             print(f"Timeout: {layer.timeout_ms}ms")
             print(f"Mappings: {list(layer.mappings.keys())}")
         print("\nMove your mouse to activate the layer, then press mapped keys.")
@@ -304,19 +475,30 @@ class AutoMouse:
         # Start system tray if available
         if TRAY_AVAILABLE:
             log.info("Starting system tray...")
+            # The menu is static (status text is a callable), so build it once
+            if self._menu is None:
+                self._menu = self._create_menu()
+            # Draw both icon variants up front so state changes never rasterize
+            self._create_icon(active=True)
+            # Record the inactive icon before publishing self.tray: once it is
+            # set, the notification thread may already update the icon, and
+            # assigning afterwards would overwrite that update
+            self._tray_active = False
             self.tray = pystray.Icon(
                 'automouse',
                 self._create_icon(active=False),
                 'AutoMouse',
-                menu=self._create_menu()
+                menu=self._menu
             )
             self.tray.run()  # This blocks until quit
         else:
             log.warning("System tray not available, running in console mode")
             print("Press Ctrl+C to quit")
             try:
-                while self._running:
-                    threading.Event().wait(1)
+                # stop() sets the event; the timeout keeps Ctrl+C responsive
+                # on Windows, where an untimed wait cannot be interrupted
+                while not self._stop_event.wait(1):
+                    pass
             except KeyboardInterrupt:
                 pass
 
@@ -326,10 +508,14 @@ class AutoMouse:
         """Stop the daemon."""
         log.info("Stopping AutoMouse...")
         self._running = False
+        self._stop_event.set()
 
         if self.keyboard:
             self.keyboard.stop()
 
+        if self.state_machine:
+            self.state_machine.close()
+
         if self.tray:
             self.tray.stop()
 
@@ -345,7 +531,7 @@ def main():
     except KeyboardInterrupt:
         app.stop()
     except Exception as e:
-        log.exception(f"Fatal error: {e}")
+        log.exception("Fatal error: %s", e)
         sys.exit(1)
 
 
@@ -8,24 +8,57 @@ States:
 """
 
 import logging
+import queue
 import time
 import threading
-from enum import Enum, auto
-from typing import Callable, Optional, List
+from time import perf_counter_ns as _clock_ns
+from enum import IntEnum
+from typing import Callable, Optional, Tuple
 from dataclasses import dataclass
 
 log = logging.getLogger(__name__)
 
 
-class LayerState(Enum):
-    NORMAL = auto()
-    MOUSE_LAYER_ACTIVE = auto()
-    LATCHED = auto()
+class LayerState(IntEnum):
+    # IntEnum so comparisons and hashing (the _TRANSITIONS lookup) use the
+    # C int implementations rather than Enum's Python-level ones
+    NORMAL = 0
+    MOUSE_LAYER_ACTIVE = 1
+    LATCHED = 2
+
+
+# Events fed to the transition table
+_EV_MOUSE = 'mouse'
+_EV_MAPPED_KEY = 'mapped_key'
+_EV_UNMAPPED_KEY = 'unmapped_key'
+_EV_LATCH = 'latch'
+_EV_EXIT = 'exit'
+
+# Timer actions
+_ARM = 1     # (Re)start the inactivity timeout
+_DISARM = 2  # Cancel the inactivity timeout
+
+# (state, event) -> (new_state, timer_action, reason).
+# Pairs not listed are no-ops; reason is None when the state does not change.
+_TRANSITIONS = {
+    (LayerState.NORMAL, _EV_MOUSE): (LayerState.MOUSE_LAYER_ACTIVE, _ARM, "mouse_activity"),
+    (LayerState.MOUSE_LAYER_ACTIVE, _EV_MOUSE): (LayerState.MOUSE_LAYER_ACTIVE, _ARM, None),
+    (LayerState.MOUSE_LAYER_ACTIVE, _EV_MAPPED_KEY): (LayerState.MOUSE_LAYER_ACTIVE, _ARM, None),
+    (LayerState.MOUSE_LAYER_ACTIVE, _EV_UNMAPPED_KEY): (LayerState.NORMAL, _DISARM, "unmapped_key"),
+    (LayerState.NORMAL, _EV_LATCH): (LayerState.LATCHED, _DISARM, "latch"),
+    (LayerState.MOUSE_LAYER_ACTIVE, _EV_LATCH): (LayerState.LATCHED, _DISARM, "latch"),
+    (LayerState.NORMAL, _EV_EXIT): (LayerState.NORMAL, _DISARM, None),
+    (LayerState.MOUSE_LAYER_ACTIVE, _EV_EXIT): (LayerState.NORMAL, _DISARM, "explicit_exit"),
+    (LayerState.LATCHED, _EV_EXIT): (LayerState.NORMAL, _DISARM, "explicit_exit"),
+}
 
 
 @dataclass
 class StateChange:
     """Represents a state transition."""
+    # Declared by hand: dataclass(slots=True) needs Python 3.10
+    __slots__ = ('old_state', 'new_state', 'reason', 'timestamp')
+
     old_state: LayerState
     new_state: LayerState
     reason: str
@@ -42,24 +75,51 @@ class LayerStateMachine:
     - Inactivity timeout
     """
 
+    __slots__ = (
+        '_state', '_timeout_ms', '_last_activity_ns', '_deadline_ns',
+        '_lock', '_cond', '_closed', '_timer_wake', '_listeners', '_fast_listeners',
+        '_notify_queue', '_notify_thread', '_timer_thread',
+    )
+
     def __init__(self, timeout_ms: int = 900):
         self._state = LayerState.NORMAL
         self._timeout_ms = timeout_ms
-        self._last_activity = 0.0
-        self._timer: Optional[threading.Timer] = None
+        # Deadlines are integer nanoseconds from _clock_ns(), so comparisons
+        # are exact int compares with no float rounding
+        self._last_activity_ns = 0  # _clock_ns() of last layer-extending activity
+        self._deadline_ns: Optional[int] = None  # _clock_ns() of timeout
         self._lock = threading.Lock()
-        self._listeners: List[Callable[[StateChange], None]] = []
+        self._cond = threading.Condition(self._lock)
+        self._closed = False
+        self._timer_wake: Optional[int] = None  # _clock_ns() the timer thread next wakes; None = parked
+        # Immutable snapshot, replaced on add/remove, so notification never
+        # has to copy or guard the sequence it iterates
+        self._listeners: Tuple[Callable[[StateChange], None], ...] = ()
+        self._fast_listeners: Tuple[Callable[[StateChange], None], ...] = ()
+
+        # Listeners run on one long-lived thread, in transition order
+        self._notify_queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._notify_thread = threading.Thread(target=self._notify_loop, daemon=True)
+        self._notify_thread.start()
+
+        # Inactivity timeout: one thread waiting on a re-armable deadline
+        self._timer_thread = threading.Thread(target=self._timer_loop, daemon=True)
+        self._timer_thread.start()
 
     @property
     def state(self) -> LayerState:
-        """Current layer state."""
-        with self._lock:
-            return self._state
+        """
+        Current layer state.
+
+        Read without the lock: the attribute read is atomic, so callers see a
+        consistent (possibly just-superseded) value. Writes hold the lock.
+        """
+        return self._state
 
     @property
     def is_active(self) -> bool:
-        """True if mouse layer is active (either active or latched)."""
-        return self._state in (LayerState.MOUSE_LAYER_ACTIVE, LayerState.LATCHED)
+        """True if mouse layer is active (either active or latched). Lock-free like state."""
+        return self._state is not LayerState.NORMAL
 
     @property
     def timeout_ms(self) -> int:
@@ -71,48 +131,89 @@ class LayerStateMachine:
         """Set the timeout in milliseconds. 0 or negative means infinite."""
         self._timeout_ms = value
 
-    def add_listener(self, callback: Callable[[StateChange], None]):
-        """Add a state change listener."""
-        self._listeners.append(callback)
+    def add_listener(self, callback: Callable[[StateChange], None], fast: bool = False):
+        """
+        Add a state change listener.
+
+        Listeners normally run on the notification thread. A fast listener is
+        instead called synchronously by the thread making the transition,
+        while the state lock is held, so it sees every change in order with
+        no queueing delay. It must return quickly and must not call the
+        machine's event methods (on_*, latch, exit_layer), which would
+        deadlock.
+        """
+        with self._lock:
+            if fast:
+                self._fast_listeners = self._fast_listeners + (callback,)
+            else:
+                self._listeners = self._listeners + (callback,)
 
     def remove_listener(self, callback: Callable[[StateChange], None]):
         """Remove a state change listener."""
-        if callback in self._listeners:
-            self._listeners.remove(callback)
+        with self._lock:
+            self._listeners = tuple(l for l in self._listeners if l != callback)
+            self._fast_listeners = tuple(l for l in self._fast_listeners if l != callback)
 
-    def _notify_listeners(self, change: StateChange):
-        """Notify all listeners of a state change."""
-        for listener in self._listeners:
+    @staticmethod
+    def _notify_listeners(change: StateChange, listeners):
+        """Notify the given listeners of a state change."""
+        for listener in listeners:
             try:
                 listener(change)
             except Exception as e:
-                log.error(f"Error in state change listener: {e}")
+                log.error("Error in state change listener: %s", e)
+
+    def _notify_loop(self):
+        """Deliver queued state changes to listeners until close()."""
+        while True:
+            change = self._notify_queue.get()
+            if change is None:
+                break
+            self._notify_listeners(change, self._listeners)
 
     def _cancel_timer(self):
-        """Cancel any pending timeout timer."""
-        if self._timer is not None:
-            self._timer.cancel()
-            self._timer = None
+        """Disarm the inactivity timeout (must hold lock)."""
+        # No wakeup needed: the timer thread sees the cleared deadline when
+        # its current wait expires and parks until the next arm.
+        self._deadline_ns = None
 
     def _start_timer(self):
-        """Start the inactivity timeout timer."""
-        self._cancel_timer()
-
+        """(Re)arm the inactivity timeout from _last_activity_ns (must hold lock)."""
         if self._timeout_ms <= 0:
+            self._cancel_timer()
             return  # Infinite timeout (latched mode)
 
-        self._timer = threading.Timer(
-            self._timeout_ms / 1000.0,
-            self._on_timeout
-        )
-        self._timer.daemon = True
-        self._timer.start()
+        deadline = self._last_activity_ns + self._timeout_ms * 1_000_000
+        self._deadline_ns = deadline
+        # A re-arm normally pushes the deadline later, so a thread already
+        # sleeping toward an earlier one just re-checks and sleeps again when
+        # it wakes. Only wake it if it is parked or would wake too late.
+        wake = self._timer_wake
+        if wake is None or deadline < wake:
+            self._cond.notify()
 
-    def _on_timeout(self):
-        """Called when the inactivity timer fires."""
-        with self._lock:
-            if self._state == LayerState.MOUSE_LAYER_ACTIVE:
-                self._transition_to(LayerState.NORMAL, "timeout")
+    def _timer_loop(self):
+        """
+        Single long-lived timer thread: sleeps until the current deadline and
+        fires the timeout if it has not been pushed back in the meantime.
+        """
+        with self._cond:
+            while not self._closed:
+                deadline = self._deadline_ns
+                if deadline is None:
+                    self._timer_wake = None
+                    self._cond.wait()
+                    continue
+
+                remaining_ns = deadline - _clock_ns()
+                if remaining_ns > 0:
+                    self._timer_wake = deadline
+                    self._cond.wait(remaining_ns / 1e9)
+                    continue
+
+                self._deadline_ns = None
+                if self._state == LayerState.MOUSE_LAYER_ACTIVE:
+                    self._transition_to(LayerState.NORMAL, "timeout")
 
     def _transition_to(self, new_state: LayerState, reason: str):
         """Internal state transition (must hold lock)."""
@@ -129,67 +230,115 @@ class LayerStateMachine:
             timestamp=time.time()
         )
 
-        # Schedule listener notification outside lock
-        threading.Thread(
-            target=self._notify_listeners,
-            args=(change,),
-            daemon=True
-        ).start()
+        fast_listeners = self._fast_listeners
+        if fast_listeners:
+            self._notify_listeners(change, fast_listeners)
+
+        # Other listeners are notified on the notification thread, outside the lock
+        self._notify_queue.put(change)
+
+    def _dispatch(self, event: str):
+        """Apply the _TRANSITIONS entry for (current state, event), if any."""
+        with self._lock:
+            entry = _TRANSITIONS.get((self._state, event))
+            if entry is None:
+                return
+
+            new_state, timer_action, reason = entry
+            if timer_action == _ARM:
+                self._last_activity_ns = _clock_ns()
+                self._start_timer()
+            elif timer_action == _DISARM:
+                self._cancel_timer()
+            if reason is not None:
+                self._transition_to(new_state, reason)
+
+    def _rearm_timer_only(self) -> bool:
+        """
+        Push the inactivity deadline back without taking the lock.
+
+        Covers the hot case of activity while the layer is already active, where
+        no transition happens and only the deadline moves. Returns False when
+        the locked path is needed instead: the layer is not active, the timeout
+        is infinite, or the timer thread is parked or would wake too late for
+        the new deadline and so must be notified.
+
+        The unlocked writes can race a timeout firing at the same instant; the
+        worst case is the layer dropping and reactivating on the next event,
+        the same boundary behaviour the old threading.Timer had.
+        """
+        if self._state is not LayerState.MOUSE_LAYER_ACTIVE:
+            return False
+        timeout_ms = self._timeout_ms
+        if timeout_ms <= 0:
+            return False
+
+        now = _clock_ns()
+        deadline = now + timeout_ms * 1_000_000
+        wake = self._timer_wake
+        if wake is None or deadline < wake:
+            return False
+
+        # The timer thread re-reads _deadline_ns when it wakes, so no notify
+        self._last_activity_ns = now
+        self._deadline_ns = deadline
+        return True
 
     def on_mouse_activity(self):
         """
         Called when pointing device motion or button activity is detected.
         Activates or extends the mouse layer.
         """
-        with self._lock:
-            self._last_activity = time.time()
-
-            if self._state == LayerState.NORMAL:
-                self._transition_to(LayerState.MOUSE_LAYER_ACTIVE, "mouse_activity")
-                self._start_timer()
-            elif self._state == LayerState.MOUSE_LAYER_ACTIVE:
-                # Reset the timeout timer
-                self._start_timer()
-            # LATCHED state: no action needed, stays latched
+        if self._rearm_timer_only():
+            return
+        self._dispatch(_EV_MOUSE)
 
     def on_mapped_key(self):
         """
         Called when a key that's mapped in the mouse layer is pressed.
         Resets the inactivity timer but doesn't change state.
         """
-        with self._lock:
-            if self._state == LayerState.MOUSE_LAYER_ACTIVE:
-                self._last_activity = time.time()
-                self._start_timer()
+        # Fast path: keys only matter while the layer is active, so skip the
+        # lock otherwise. _dispatch re-checks the state under the lock.
+        if self._state is not LayerState.MOUSE_LAYER_ACTIVE:
+            return
+        if self._rearm_timer_only():
+            return
+        self._dispatch(_EV_MAPPED_KEY)
 
     def on_unmapped_key(self):
         """
         Called when an unmapped key is pressed.
         Exits the mouse layer if exit_on_other_key is enabled.
         """
-        with self._lock:
-            if self._state == LayerState.MOUSE_LAYER_ACTIVE:
-                self._cancel_timer()
-                self._transition_to(LayerState.NORMAL, "unmapped_key")
+        # Same lock-free fast path as on_mapped_key
+        if self._state is not LayerState.MOUSE_LAYER_ACTIVE:
+            return
+        self._dispatch(_EV_UNMAPPED_KEY)
 
     def latch(self):
         """
         Latch the mouse layer so it persists until explicitly exited.
         """
-        with self._lock:
-            if self._state in (LayerState.NORMAL, LayerState.MOUSE_LAYER_ACTIVE):
-                self._cancel_timer()
-                self._transition_to(LayerState.LATCHED, "latch")
+        self._dispatch(_EV_LATCH)
 
     def exit_layer(self):
         """
         Explicitly exit the mouse layer.
         """
-        with self._lock:
-            self._cancel_timer()
-            if self._state != LayerState.NORMAL:
-                self._transition_to(LayerState.NORMAL, "explicit_exit")
+        self._dispatch(_EV_EXIT)
 
     def reset(self):
         """Reset to normal state."""
         self.exit_layer()
+
+    def close(self):
+        """
+        Stop the timer and notification threads.
+        Changes queued before close() are still delivered.
+        """
+        with self._lock:
+            self._closed = True
+            self._cancel_timer()
+            self._cond.notify()
+        self._notify_queue.put(None)